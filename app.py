@@ -1,11 +1,6 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 from src.simulation import ParachuteSimulation
-from src.physics import PhysicsCalculator
 from utils.input_handler import InputHandler
 from utils.graph_utils import GraphUtils
 
@@ -54,6 +49,18 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_simulation(global_items, phase_items, selected_phases, integrator, skip_steady_state):
+    """Run a simulation from hashable parameter tuples so repeated inputs hit the cache"""
+    global_params = dict(global_items)
+    phase_params = {phase: params._asdict() for phase, params in phase_items}
+    
+    simulation = ParachuteSimulation(global_params, phase_params, list(selected_phases),
+                                     integrator=integrator, skip_steady_state=skip_steady_state)
+    results = simulation.run()
+    
+    return results, simulation.get_plot_data()
+
 def main():
     st.markdown('<h1 class="main-header">🪂 Parachute Physics Simulator</h1>', unsafe_allow_html=True)
     
@@ -119,6 +126,22 @@ def main():
                 step=1.0,
                 key="descent_angle"
             )
+        
+        integrator = st.selectbox(
+            "Integrator",
+            options=["Euler", "RK4"],
+            key="integrator",
+            help="RK4 stays accurate at much larger time steps (e.g. 0.05 s vs 0.001 s for Euler)"
+        )
+        
+        skip_steady_state = st.checkbox(
+            "Fast-forward steady descent",
+            value=False,
+            key="skip_steady_state",
+            help="Jump over stretches of settled terminal-velocity descent instead of stepping "
+                 "through them. Much faster, but results are approximate (typically within 0.05% "
+                 "of full integration)"
+        )
     
     # Main content area
     input_handler = InputHandler()
@@ -143,19 +166,22 @@ def main():
         if st.button("🚀 Run Simulation", type="primary", use_container_width=True):
             with st.spinner("Running physics simulation..."):
                 try:
-                    # Initialize simulation
-                    simulation = ParachuteSimulation(global_params, phase_params, selected_phases)
-                    
-                    # Run simulation
-                    results = simulation.run()
+                    # Run simulation (cached on the full set of inputs)
+                    results, plots_data = run_simulation(
+                        tuple(sorted(global_params.items())),
+                        tuple((phase, phase_params[phase]) for phase in selected_phases),
+                        tuple(selected_phases),
+                        integrator,
+                        skip_steady_state
+                    )
                     
                     # Store results in session state
                     st.session_state.results = results
                     st.session_state.simulation_complete = True
-                    st.session_state.plots_data = simulation.get_plot_data()
+                    st.session_state.plots_data = plots_data
                     
                     st.success("Simulation completed successfully!")
-                    
+                
                 except Exception as e:
                     st.error(f"Simulation failed: {str(e)}")
                     return
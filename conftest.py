@@ -0,0 +1,4 @@
+"""
+Root conftest: its presence puts the repository root on sys.path, so the tests
+can import the src package under plain pytest as well as python -m pytest.
+"""
@@ -0,0 +1,24 @@
+"""
+Builds the optional Cython simulation kernel (src/_phys_core.pyx):
+
+    python setup.py build_ext --inplace
+
+Without it the app uses the Numba kernels in src/_kernels.py.
+"""
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+# -O3 only: -march=native would tie the binary to the build machine's CPU and
+# -ffast-math would let results drift from the Numba kernel
+extensions = [
+    Extension(
+        "src._phys_core",
+        ["src/_phys_core.pyx"],
+        extra_compile_args=["-O3"],
+    )
+]
+
+setup(
+    name="parachute-simulator",
+    ext_modules=cythonize(extensions),
+)
@@ -0,0 +1,403 @@
+"""
+Numba kernels for the simulation hot paths. Compiled with cache=True so the
+machine code is stored on disk and reused across Streamlit reruns and restarts.
+"""
+import math
+import numpy as np
+from numba import njit, prange
+
+# Integration schemes understood by _simulate and _simulate_batch
+EULER = 0
+RK4 = 1
+
+# Steady-descent fast-forward: after STEADY_STEPS consecutive steps with
+# |net acceleration| below STEADY_ACCELERATION (m/s^2) and every deployed canopy
+# fully inflated, the descent jumps to STEADY_RESUME_HEIGHT (m) above the next
+# deployment altitude (or the ground) and normal integration resumes
+STEADY_ACCELERATION = 1e-3
+STEADY_STEPS = 100
+STEADY_RESUME_HEIGHT = 10.0
+
+# Revision of the _simulate contract (arguments and physics). Bump it on any change
+# to _simulate or the helpers it calls, and mirror the change in _phys_core.pyx:
+# a Cython build reporting a different revision or constants is not used
+KERNEL_VERSION = 2
+KERNEL_CONSTANTS = (EULER, RK4, STEADY_ACCELERATION, STEADY_STEPS, STEADY_RESUME_HEIGHT)
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _air_density(altitude, rho_table):
+    """
+    Look up air density at given altitude, interpolating linearly
+    between the 1 m nodes of the ISA table
+    """
+    if altitude <= 0:
+        return rho_table[0]
+    
+    # Compare before converting: int() of a huge altitude overflows to a negative index
+    if altitude >= rho_table.shape[0] - 1:
+        return rho_table[rho_table.shape[0] - 1]  # Minimum density for very high altitudes
+    
+    idx = int(altitude)
+    frac = altitude - idx
+    return rho_table[idx] + frac * (rho_table[idx + 1] - rho_table[idx])
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _drag_from_rho(rho, velocity, area, drag_coefficient,
+                   reefing_factor, time_since_deployment, inflation_time):
+    """
+    Calculate drag force: F_d = (1/2) * ρ * v^2 * C_d * A
+    Includes reefing effects during inflation; density and canopy area are precomputed
+    """
+    if velocity <= 0:
+        return 0.0
+    
+    # Base drag force
+    base_drag = 0.5 * rho * velocity * velocity * drag_coefficient * area
+    
+    # Apply reefing effects during inflation: linear scaling from reefed to full
+    # drag, with progress clamped at 1 so no branch is needed once inflated
+    inflation_progress = min(time_since_deployment / max(inflation_time, 1e-9), 1.0)
+    effective_drag_coefficient = (reefing_factor + 
+                                (1 - reefing_factor) * inflation_progress)
+    
+    return base_drag * effective_drag_coefficient
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _drag(altitude, velocity, area, drag_coefficient,
+          reefing_factor, time_since_deployment, inflation_time, rho_table):
+    """
+    Calculate drag force at given altitude, looking up the air density first
+    """
+    return _drag_from_rho(_air_density(altitude, rho_table), velocity, area, drag_coefficient,
+                          reefing_factor, time_since_deployment, inflation_time)
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _inflation_time(n_factor, diameter, velocity):
+    """
+    Calculate inflation time: t_inflate = n * D / V
+    """
+    if velocity <= 0:
+        return 0.0
+    
+    inflation_time = n_factor * diameter / velocity
+    return max(inflation_time, 0.1)  # Minimum inflation time
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _acceleration(h, v, t, gravity_component, mass, n_deployed,
+                  phase_area, phase_Cd, phase_reef, deploy_t, inflate_t, rho_table):
+    """Net acceleration (positive downward) of the deployed phases at state (h, v, t)"""
+    rho = _air_density(h, rho_table)
+    total_drag = 0.0
+    for k in range(n_deployed):
+        total_drag += _drag_from_rho(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                                     t - deploy_t[k], inflate_t[k])
+    return gravity_component - total_drag / mass
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _integrate_step(h, v, x, t, dt, net_acceleration, gravity_component, mass,
+                    sin_angle, integrator, n_deployed, phase_area, phase_Cd,
+                    phase_reef, deploy_t, inflate_t, rho_table):
+    """
+    Advance (h, v, x) by one time step, given the net acceleration at the
+    start of the step. Returns the updated state.
+    """
+    if integrator == RK4:
+        # Intermediate stages reuse the drag model at the midpoint and end states
+        half_dt = 0.5 * dt
+        v2 = v + half_dt * net_acceleration
+        a2 = _acceleration(h - half_dt * v, v2, t + half_dt, gravity_component, mass,
+                           n_deployed, phase_area, phase_Cd, phase_reef,
+                           deploy_t, inflate_t, rho_table)
+        v3 = v + half_dt * a2
+        a3 = _acceleration(h - half_dt * v2, v3, t + half_dt, gravity_component, mass,
+                           n_deployed, phase_area, phase_Cd, phase_reef,
+                           deploy_t, inflate_t, rho_table)
+        v4 = v + dt * a3
+        a4 = _acceleration(h - dt * v3, v4, t + dt, gravity_component, mass,
+                           n_deployed, phase_area, phase_Cd, phase_reef,
+                           deploy_t, inflate_t, rho_table)
+        
+        distance = dt * (v + 2 * v2 + 2 * v3 + v4) / 6
+        v += dt * (net_acceleration + 2 * a2 + 2 * a3 + a4) / 6
+        if v < 0.0:
+            v = 0.0
+        h -= distance
+        x += distance * sin_angle
+    else:
+        # Semi-implicit Euler: position uses the updated velocity
+        v += net_acceleration * dt
+        if v < 0.0:
+            v = 0.0
+        h -= v * dt
+        x += v * sin_angle * dt
+    
+    return h, v, x
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _is_steady(net_acceleration, gravity_component, t, n_deployed, deploy_t, inflate_t):
+    """
+    True when the net acceleration is negligible, gravity is still driving the
+    descent and no canopy is still inflating
+    """
+    if n_deployed == 0 or gravity_component <= 0 or abs(net_acceleration) >= STEADY_ACCELERATION:
+        return False
+    for k in range(n_deployed):
+        if t - deploy_t[k] < inflate_t[k]:
+            return False
+    return True
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _steady_descent(h, h_target, gravity_component, mass, n_deployed,
+                    phase_area, phase_Cd, rho_table):
+    """
+    Time to descend from h to h_target at the local terminal velocity
+    v_t(h) = sqrt(2*m*g*cos(angle) / (ρ(h) * Σ C_d*A)), integrating dh / v_t(h)
+    with Simpson's rule. Returns the elapsed time and v_t at h_target
+    """
+    cd_area = 0.0
+    for k in range(n_deployed):
+        cd_area += phase_Cd[k] * phase_area[k]
+    weight = 2.0 * mass * gravity_component / cd_area
+    
+    inv_v_start = math.sqrt(_air_density(h, rho_table) / weight)
+    inv_v_mid = math.sqrt(_air_density(0.5 * (h + h_target), rho_table) / weight)
+    inv_v_end = math.sqrt(_air_density(h_target, rho_table) / weight)
+    
+    elapsed = (h - h_target) * (inv_v_start + 4.0 * inv_v_mid + inv_v_end) / 6.0
+    return elapsed, 1.0 / inv_v_end
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _fast_forward(h, v, x, t, steady_steps, net_acceleration, gravity_component, sin_angle,
+                  mass, n_deployed, can_skip, phase_deploy_alt, phase_area, phase_Cd,
+                  deploy_t, inflate_t, rho_table):
+    """
+    Steady-descent fast-forward, run after every step: counts consecutive steady
+    steps and, once STEADY_STEPS is reached (and can_skip), jumps the state to
+    STEADY_RESUME_HEIGHT above the next deployment altitude (or the ground).
+    Returns (h, v, x, t, steady_steps, skipped).
+    """
+    if _is_steady(net_acceleration, gravity_component, t, n_deployed, deploy_t, inflate_t):
+        steady_steps += 1
+    else:
+        steady_steps = 0
+    
+    h_target = STEADY_RESUME_HEIGHT
+    if n_deployed < phase_deploy_alt.shape[0]:
+        h_target += phase_deploy_alt[n_deployed]
+    
+    if can_skip and steady_steps >= STEADY_STEPS and h > h_target:
+        elapsed, v_target = _steady_descent(h, h_target, gravity_component, mass,
+                                            n_deployed, phase_area, phase_Cd, rho_table)
+        
+        # Skip only when the segment ends inside the 10000 s cap
+        if t + elapsed <= 10000:
+            return h_target, v_target, x + (h - h_target) * sin_angle, t + elapsed, 0, True
+    
+    return h, v, x, t, steady_steps, False
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _first_selected(phase_order, n_deployed):
+    """
+    Packed row of the deployed phase that comes first in selection order
+    (lowest phase_order) among the first n_deployed rows
+    """
+    row = 0
+    for k in range(1, n_deployed):
+        if phase_order[k] < phase_order[row]:
+            row = k
+    return row
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def _simulate(alt0, v0, dt, gravity_component, sin_angle, default_mass, integrator, skip_steady,
+              phase_deploy_alt, phase_diam, phase_area, phase_Cd, phase_reef, phase_n, phase_mass,
+              phase_order, out_t, out_h, out_v, out_Fd, out_x, out_phase_F,
+              out_deployed, out_deploy_t, out_inflate_t, rho_table):
+    """
+    Time-march the descent with semi-implicit Euler or classical RK4
+    integration of h' = -v, v' = g*cos(angle) - F_d/m.
+    
+    Phase arrays must be sorted by deployment altitude (descending) so the
+    next phase to deploy is always at index n_deployed; phase_order holds each
+    row's index in the user's phase selection. Output arrays are
+    filled in place; returns the number of steps written. With skip_steady,
+    quasi-steady terminal descent is fast-forwarded and recorded as a single
+    keyframe sample.
+    """
+    n_phases = phase_deploy_alt.shape[0]
+    max_steps = out_t.shape[0]
+    
+    t = 0.0
+    h = alt0
+    v = v0
+    x = 0.0
+    n_deployed = 0
+    steady_steps = 0
+    i = 0
+    
+    # Mass of the first deployed phase, or the default before any deployment
+    mass = default_mass
+    mass_row = -1
+    
+    while h > 0 and i < max_steps:
+        # Deploy every phase whose deployment altitude has been reached
+        while n_deployed < n_phases and h <= phase_deploy_alt[n_deployed]:
+            out_deployed[n_deployed] = True
+            out_deploy_t[n_deployed] = t
+            out_inflate_t[n_deployed] = _inflation_time(
+                phase_n[n_deployed], phase_diam[n_deployed], v
+            )
+            n_deployed += 1
+        
+        # Phases deploying on the same (first) step are taken in selection order,
+        # so the mass comes from the first selected of them, not the highest one
+        if mass_row < 0 and n_deployed > 0:
+            mass_row = _first_selected(phase_order, n_deployed)
+            mass = phase_mass[mass_row]
+        
+        # Drag forces for all deployed phases, sharing one density lookup
+        rho = _air_density(h, rho_table)
+        total_drag = 0.0
+        for k in range(n_deployed):
+            drag_force = _drag_from_rho(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                                        t - out_deploy_t[k], out_inflate_t[k])
+            out_phase_F[i, k] = drag_force
+            total_drag += drag_force
+        out_Fd[i] = total_drag
+        
+        # Net acceleration (positive downward)
+        net_acceleration = gravity_component - total_drag / mass
+        
+        h, v, x = _integrate_step(h, v, x, t, dt, net_acceleration, gravity_component, mass,
+                                  sin_angle, integrator, n_deployed, phase_area, phase_Cd,
+                                  phase_reef, out_deploy_t, out_inflate_t, rho_table)
+        
+        # Store data
+        out_t[i] = t
+        out_h[i] = h if h > 0.0 else 0.0
+        out_v[i] = v
+        out_x[i] = x
+        
+        # Advance time
+        t += dt
+        i += 1
+        
+        # Fast-forward steady terminal descent (the keyframe needs a free slot)
+        if skip_steady:
+            h, v, x, t, steady_steps, skipped = _fast_forward(
+                h, v, x, t, steady_steps, net_acceleration, gravity_component, sin_angle,
+                mass, n_deployed, i < max_steps, phase_deploy_alt, phase_area, phase_Cd,
+                out_deploy_t, out_inflate_t, rho_table
+            )
+            
+            if skipped:
+                # Keyframe at the end of the skipped segment (labelled like a regular
+                # step: start time of the step whose end state it holds)
+                rho = _air_density(h, rho_table)
+                total_drag = 0.0
+                for k in range(n_deployed):
+                    drag_force = _drag_from_rho(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                                                t - out_deploy_t[k], out_inflate_t[k])
+                    out_phase_F[i, k] = drag_force
+                    total_drag += drag_force
+                out_Fd[i] = total_drag
+                out_t[i] = t - dt
+                out_h[i] = h
+                out_v[i] = v
+                out_x[i] = x
+                i += 1
+        
+        # Safety check
+        if t > 10000:  # 10000 seconds max
+            break
+    
+    return i
+
+
+@njit(cache=True, fastmath=True, boundscheck=False, parallel=True)
+def _simulate_batch(lane_alt0, lane_v0, lane_default_mass, lane_phase_mass, dt,
+                    gravity_component, sin_angle, integrator, skip_steady, max_steps,
+                    phase_deploy_alt, phase_diam, phase_area, phase_Cd, phase_reef, phase_n,
+                    phase_order, out_max_drag, out_landing_v, out_flight_t, out_range, rho_table):
+    """
+    Time-march an ensemble of descents, one lane per initial condition, in
+    parallel across lanes. Only per-lane summary metrics are written (into
+    the out_* arrays), not full trajectories.
+    """
+    n_lanes = lane_alt0.shape[0]
+    n_phases = phase_deploy_alt.shape[0]
+    
+    for j in prange(n_lanes):
+        deploy_t = np.zeros(n_phases)
+        inflate_t = np.zeros(n_phases)
+        
+        t = 0.0
+        h = lane_alt0[j]
+        v = lane_v0[j]
+        x = 0.0
+        n_deployed = 0
+        steady_steps = 0
+        max_drag = 0.0
+        i = 0
+        mass = lane_default_mass[j]
+        mass_row = -1
+        
+        while h > 0 and i < max_steps:
+            # Deploy every phase whose deployment altitude has been reached
+            while n_deployed < n_phases and h <= phase_deploy_alt[n_deployed]:
+                deploy_t[n_deployed] = t
+                inflate_t[n_deployed] = _inflation_time(
+                    phase_n[n_deployed], phase_diam[n_deployed], v
+                )
+                n_deployed += 1
+            
+            # Mass of the first selected phase among those deploying on the first step
+            if mass_row < 0 and n_deployed > 0:
+                mass_row = _first_selected(phase_order, n_deployed)
+                mass = lane_phase_mass[j, mass_row]
+            
+            # Drag forces for all deployed phases, sharing one density lookup
+            rho = _air_density(h, rho_table)
+            total_drag = 0.0
+            for k in range(n_deployed):
+                total_drag += _drag_from_rho(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                                             t - deploy_t[k], inflate_t[k])
+            if total_drag > max_drag:
+                max_drag = total_drag
+            
+            net_acceleration = gravity_component - total_drag / mass
+            h, v, x = _integrate_step(h, v, x, t, dt, net_acceleration, gravity_component, mass,
+                                      sin_angle, integrator, n_deployed, phase_area, phase_Cd,
+                                      phase_reef, deploy_t, inflate_t, rho_table)
+            
+            # Summary values of the last step written
+            out_max_drag[j] = max_drag
+            out_landing_v[j] = v
+            out_flight_t[j] = t
+            out_range[j] = x
+            
+            t += dt
+            i += 1
+            
+            # Fast-forward steady terminal descent (drag stays at m*g*cos(angle),
+            # below the recorded peak, so only the state needs updating)
+            if skip_steady:
+                h, v, x, t, steady_steps, _ = _fast_forward(
+                    h, v, x, t, steady_steps, net_acceleration, gravity_component, sin_angle,
+                    mass, n_deployed, True, phase_deploy_alt, phase_area, phase_Cd,
+                    deploy_t, inflate_t, rho_table
+                )
+            
+            # Safety check
+            if t > 10000:  # 10000 seconds max
+                break
@@ -0,0 +1,267 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True, initializedcheck=False
+"""
+Cython build of the descent kernel in _kernels._simulate. It is compiled ahead
+of time (see setup.py), so there is no JIT warm-up on a fresh deployment.
+ParachuteSimulation uses it when the extension is built and falls back to the
+Numba kernel otherwise; physics and outputs match the Numba version.
+"""
+import numpy as np
+from libc.math cimport sqrt, fabs
+
+# Must match EULER / RK4 and the steady-descent constants in _kernels.py
+cdef enum:
+    EULER = 0
+    RK4 = 1
+
+cdef double STEADY_ACCELERATION = 1e-3
+cdef int STEADY_STEPS = 100
+cdef double STEADY_RESUME_HEIGHT = 10.0
+
+# Checked against _kernels.KERNEL_VERSION / KERNEL_CONSTANTS at import, so a build
+# that is out of date with _kernels.py falls back to the Numba kernel
+KERNEL_VERSION = 2
+KERNEL_CONSTANTS = (EULER, RK4, STEADY_ACCELERATION, STEADY_STEPS, STEADY_RESUME_HEIGHT)
+
+
+cdef inline double air_density(double altitude, const double[::1] rho_table) noexcept nogil:
+    """
+    Look up air density at given altitude, interpolating linearly
+    between the 1 m nodes of the ISA table
+    """
+    cdef Py_ssize_t n = rho_table.shape[0]
+    cdef Py_ssize_t idx
+    
+    if altitude <= 0:
+        return rho_table[0]
+    
+    # Compare before converting: the cast of a huge altitude overflows to a negative index
+    if altitude >= n - 1:
+        return rho_table[n - 1]  # Minimum density for very high altitudes
+    
+    idx = <Py_ssize_t>altitude
+    return rho_table[idx] + (altitude - idx) * (rho_table[idx + 1] - rho_table[idx])
+
+
+cdef inline double drag(double rho, double velocity, double area, double drag_coefficient,
+                        double reefing_factor, double time_since_deployment,
+                        double inflation_time) noexcept nogil:
+    """
+    Calculate drag force: F_d = (1/2) * ρ * v^2 * C_d * A
+    Includes reefing effects during inflation; density and canopy area are precomputed
+    """
+    cdef double inflation_progress
+    
+    if velocity <= 0:
+        return 0.0
+    
+    inflation_progress = time_since_deployment / (inflation_time if inflation_time > 1e-9 else 1e-9)
+    if inflation_progress > 1.0:
+        inflation_progress = 1.0
+    
+    return (0.5 * rho * velocity * velocity * drag_coefficient * area *
+            (reefing_factor + (1 - reefing_factor) * inflation_progress))
+
+
+cdef inline double inflation_time(double n_factor, double diameter, double velocity) noexcept nogil:
+    """
+    Calculate inflation time: t_inflate = n * D / V
+    """
+    cdef double t_inflate
+    
+    if velocity <= 0:
+        return 0.0
+    
+    t_inflate = n_factor * diameter / velocity
+    return t_inflate if t_inflate > 0.1 else 0.1  # Minimum inflation time
+
+
+cdef inline double acceleration(double h, double v, double t, double gravity_component,
+                                double mass, Py_ssize_t n_deployed,
+                                const double[::1] phase_area, const double[::1] phase_Cd,
+                                const double[::1] phase_reef, double[::1] deploy_t,
+                                double[::1] inflate_t, const double[::1] rho_table) noexcept nogil:
+    """Net acceleration (positive downward) of the deployed phases at state (h, v, t)"""
+    cdef double rho = air_density(h, rho_table)
+    cdef double total_drag = 0.0
+    cdef Py_ssize_t k
+    
+    for k in range(n_deployed):
+        total_drag += drag(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                           t - deploy_t[k], inflate_t[k])
+    return gravity_component - total_drag / mass
+
+
+cdef inline bint fast_forward(double* h, double* v, double* x, double* t, int* steady_steps,
+                              double net_acceleration, double gravity_component, double sin_angle,
+                              double mass, Py_ssize_t n_deployed, bint can_skip,
+                              const double[::1] phase_deploy_alt, const double[::1] phase_area,
+                              const double[::1] phase_Cd, double[::1] deploy_t,
+                              double[::1] inflate_t, const double[::1] rho_table) noexcept nogil:
+    """
+    Steady-descent fast-forward, as _kernels._fast_forward: updates the steady
+    step count and, when a jump is taken, the state in place; returns whether
+    the state jumped
+    """
+    cdef bint steady = (n_deployed > 0 and gravity_component > 0 and
+                        fabs(net_acceleration) < STEADY_ACCELERATION)
+    cdef double h_target, cd_area, weight, inv_v_start, inv_v_mid, inv_v_end, elapsed
+    cdef Py_ssize_t k
+    
+    for k in range(n_deployed):
+        if t[0] - deploy_t[k] < inflate_t[k]:
+            steady = False
+    if steady:
+        steady_steps[0] += 1
+    else:
+        steady_steps[0] = 0
+    
+    h_target = STEADY_RESUME_HEIGHT
+    if n_deployed < phase_deploy_alt.shape[0]:
+        h_target += phase_deploy_alt[n_deployed]
+    
+    if not (can_skip and steady_steps[0] >= STEADY_STEPS and h[0] > h_target):
+        return False
+    
+    # Simpson's rule on dh / v_t(h), see _kernels._steady_descent
+    cd_area = 0.0
+    for k in range(n_deployed):
+        cd_area += phase_Cd[k] * phase_area[k]
+    weight = 2.0 * mass * gravity_component / cd_area
+    
+    inv_v_start = sqrt(air_density(h[0], rho_table) / weight)
+    inv_v_mid = sqrt(air_density(0.5 * (h[0] + h_target), rho_table) / weight)
+    inv_v_end = sqrt(air_density(h_target, rho_table) / weight)
+    elapsed = (h[0] - h_target) * (inv_v_start + 4.0 * inv_v_mid + inv_v_end) / 6.0
+    
+    # Skip only when the segment ends inside the 10000 s cap
+    if t[0] + elapsed > 10000:
+        return False
+    
+    v[0] = 1.0 / inv_v_end
+    x[0] += (h[0] - h_target) * sin_angle
+    h[0] = h_target
+    t[0] += elapsed
+    steady_steps[0] = 0
+    return True
+
+
+def simulate(double alt0, double v0, double dt, double gravity_component, double sin_angle,
+             double default_mass, int integrator, bint skip_steady,
+             const double[::1] phase_deploy_alt, const double[::1] phase_diam,
+             const double[::1] phase_area, const double[::1] phase_Cd,
+             const double[::1] phase_reef, const double[::1] phase_n,
+             const double[::1] phase_mass, const Py_ssize_t[::1] phase_order,
+             double[::1] out_t, double[::1] out_h, double[::1] out_v, double[::1] out_Fd,
+             double[::1] out_x, double[:, ::1] out_phase_F,
+             out_deployed, double[::1] out_deploy_t, double[::1] out_inflate_t,
+             const double[::1] rho_table):
+    """
+    Same contract as _kernels._simulate: output arrays are filled in place and
+    the number of steps written is returned
+    """
+    cdef unsigned char[::1] deployed = out_deployed.view(np.uint8)
+    cdef Py_ssize_t n_phases = phase_deploy_alt.shape[0]
+    cdef Py_ssize_t max_steps = out_t.shape[0]
+    cdef Py_ssize_t n_deployed = 0, i = 0, k, mass_row = -1
+    cdef int steady_steps = 0
+    cdef double t = 0.0, h = alt0, v = v0, x = 0.0
+    cdef double mass = default_mass
+    cdef double rho, drag_force, total_drag, net_acceleration, half_dt, distance
+    cdef double v2, v3, v4, a2, a3, a4
+    
+    with nogil:
+        while h > 0 and i < max_steps:
+            # Deploy every phase whose deployment altitude has been reached
+            while n_deployed < n_phases and h <= phase_deploy_alt[n_deployed]:
+                deployed[n_deployed] = 1
+                out_deploy_t[n_deployed] = t
+                out_inflate_t[n_deployed] = inflation_time(
+                    phase_n[n_deployed], phase_diam[n_deployed], v
+                )
+                n_deployed += 1
+            
+            # Mass of the first selected phase among those deploying on the first step
+            if mass_row < 0 and n_deployed > 0:
+                mass_row = 0
+                for k in range(1, n_deployed):
+                    if phase_order[k] < phase_order[mass_row]:
+                        mass_row = k
+                mass = phase_mass[mass_row]
+            
+            # Drag forces for all deployed phases, sharing one density lookup
+            rho = air_density(h, rho_table)
+            total_drag = 0.0
+            for k in range(n_deployed):
+                drag_force = drag(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                                  t - out_deploy_t[k], out_inflate_t[k])
+                out_phase_F[i, k] = drag_force
+                total_drag += drag_force
+            out_Fd[i] = total_drag
+            
+            # Net acceleration (positive downward)
+            net_acceleration = gravity_component - total_drag / mass
+            
+            if integrator == RK4:
+                half_dt = 0.5 * dt
+                v2 = v + half_dt * net_acceleration
+                a2 = acceleration(h - half_dt * v, v2, t + half_dt, gravity_component, mass,
+                                  n_deployed, phase_area, phase_Cd, phase_reef,
+                                  out_deploy_t, out_inflate_t, rho_table)
+                v3 = v + half_dt * a2
+                a3 = acceleration(h - half_dt * v2, v3, t + half_dt, gravity_component, mass,
+                                  n_deployed, phase_area, phase_Cd, phase_reef,
+                                  out_deploy_t, out_inflate_t, rho_table)
+                v4 = v + dt * a3
+                a4 = acceleration(h - dt * v3, v4, t + dt, gravity_component, mass,
+                                  n_deployed, phase_area, phase_Cd, phase_reef,
+                                  out_deploy_t, out_inflate_t, rho_table)
+                
+                distance = dt * (v + 2 * v2 + 2 * v3 + v4) / 6
+                v += dt * (net_acceleration + 2 * a2 + 2 * a3 + a4) / 6
+                if v < 0.0:
+                    v = 0.0
+                h -= distance
+                x += distance * sin_angle
+            else:
+                # Semi-implicit Euler: position uses the updated velocity
+                v += net_acceleration * dt
+                if v < 0.0:
+                    v = 0.0
+                h -= v * dt
+                x += v * sin_angle * dt
+            
+            # Store data
+            out_t[i] = t
+            out_h[i] = h if h > 0.0 else 0.0
+            out_v[i] = v
+            out_x[i] = x
+            
+            # Advance time
+            t += dt
+            i += 1
+            
+            # Fast-forward steady terminal descent (the keyframe needs a free slot)
+            if skip_steady and fast_forward(&h, &v, &x, &t, &steady_steps, net_acceleration,
+                                            gravity_component, sin_angle, mass, n_deployed,
+                                            i < max_steps, phase_deploy_alt, phase_area,
+                                            phase_Cd, out_deploy_t, out_inflate_t, rho_table):
+                # Keyframe at the end of the skipped segment
+                rho = air_density(h, rho_table)
+                total_drag = 0.0
+                for k in range(n_deployed):
+                    drag_force = drag(rho, v, phase_area[k], phase_Cd[k], phase_reef[k],
+                                      t - out_deploy_t[k], out_inflate_t[k])
+                    out_phase_F[i, k] = drag_force
+                    total_drag += drag_force
+                out_Fd[i] = total_drag
+                out_t[i] = t - dt
+                out_h[i] = h
+                out_v[i] = v
+                out_x[i] = x
+                i += 1
+            
+            # Safety check
+            if t > 10000:  # 10000 seconds max
+                break
+    
+    return i
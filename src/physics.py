@@ -1,81 +1,88 @@
+import math
+import warnings
 import numpy as np
+from ._kernels import _air_density, _drag, _drag_from_rho, _inflation_time
+
+# Physical constants
+G = 9.81  # gravity (m/s^2)
+RHO0 = 1.225  # sea-level air density (kg/m^3)
+T0 = 288.15  # sea-level temperature (K)
+L = 0.0065  # temperature lapse rate (K/m)
+
+
+# Air density lookup table at 1 m resolution using the ISA model
+# rho = rho0 * (1 - 0.0065 * h / 288.15) ^ 5.2561, covering every altitude where the
+# temperature ratio is positive (above that the density is floored at 0.001)
+RHO_TABLE_MAX_ALTITUDE = int(T0 / L)
+_table_altitudes = np.arange(RHO_TABLE_MAX_ALTITUDE + 1, dtype=np.float64)
+RHO_TABLE = np.maximum(RHO0 * np.maximum(1 - L * _table_altitudes / T0, 0) ** 5.2561, 0.001)
+
 
 class PhysicsCalculator:
     def __init__(self):
         # Physical constants
-        self.g = 9.81  # gravity (m/s^2)
-        self.rho0 = 1.225  # sea-level air density (kg/m^3)
-        self.T0 = 288.15  # sea-level temperature (K)
-        self.L = 0.0065  # temperature lapse rate (K/m)
+        self.g = G  # gravity (m/s^2)
+        self.rho0 = RHO0  # sea-level air density (kg/m^3)
+        self.T0 = T0  # sea-level temperature (K)
+        self.L = L  # temperature lapse rate (K/m)
         
+        # Precomputed air density table (shared, built once at import)
+        self._rho = RHO_TABLE
+    
     def calculate_air_density(self, altitude):
         """
         Calculate air density at given altitude using ISA model
         rho = rho0 * (1 - 0.0065 * h / 288.15) ^ 5.2561
         """
-        if altitude < 0:
-            altitude = 0
-        
-        temperature_ratio = 1 - (self.L * altitude / self.T0)
-        
-        if temperature_ratio <= 0:
-            return 0.001  # Minimum density for very high altitudes
-        
-        density = self.rho0 * (temperature_ratio ** 5.2561)
-        return max(density, 0.001)  # Ensure positive density
+        return _air_density(float(altitude), self._rho)
+    
+    def calculate_parachute_area(self, diameter):
+        """
+        Calculate parachute area: A = π * (D/2)^2
+        """
+        return math.pi * (diameter * 0.5) ** 2
+    
+    def drag_from_rho(self, rho, velocity, area, drag_coefficient,
+                      reefing_factor, time_since_deployment, inflation_time):
+        """
+        Calculate drag force: F_d = (1/2) * ρ * v^2 * C_d * A from a precomputed
+        air density, so one density lookup can be shared by every phase at a time step
+        """
+        return _drag_from_rho(float(rho), float(velocity), float(area), float(drag_coefficient),
+                              float(reefing_factor), float(time_since_deployment), float(inflation_time))
     
     def calculate_drag_force(self, altitude, velocity, diameter, drag_coefficient, 
                            reefing_factor, time_since_deployment, inflation_time):
         """
         Calculate drag force: F_d = (1/2) * ρ(h) * v^2 * C_d * A
-        Includes reefing effects during inflation
+        Includes reefing effects during inflation.
+        Deprecated: kept with its original signature for backward compatibility; new
+        code passes a precomputed density and canopy area to drag_from_rho
         """
-        if velocity <= 0:
-            return 0
-        
-        # Calculate air density at current altitude
-        rho = self.calculate_air_density(altitude)
-        
-        # Calculate parachute area
-        area = np.pi * (diameter / 2) ** 2
-        
-        # Base drag force
-        base_drag = 0.5 * rho * velocity**2 * drag_coefficient * area
-        
-        # Apply reefing effects during inflation
-        if time_since_deployment < inflation_time:
-            # Linear scaling from reefed to full drag during inflation
-            inflation_progress = time_since_deployment / inflation_time
-            effective_drag_coefficient = (reefing_factor + 
-                                        (1 - reefing_factor) * inflation_progress)
-            drag_force = base_drag * effective_drag_coefficient
-        else:
-            # Full drag after inflation
-            drag_force = base_drag
-        
-        return drag_force
+        warnings.warn("calculate_drag_force is deprecated, use drag_from_rho",
+                      DeprecationWarning, stacklevel=2)
+        area = self.calculate_parachute_area(diameter)
+        return _drag(float(altitude), float(velocity), float(area), float(drag_coefficient),
+                     float(reefing_factor), float(time_since_deployment), float(inflation_time),
+                     self._rho)
     
     def calculate_inflation_time(self, n_factor, diameter, velocity):
         """
         Calculate inflation time: t_inflate = n * D / V
         """
-        if velocity <= 0:
-            return 0
-        
-        inflation_time = n_factor * diameter / velocity
-        return max(inflation_time, 0.1)  # Minimum inflation time
+        return _inflation_time(float(n_factor), float(diameter), float(velocity))
     
     def calculate_terminal_velocity(self, mass, diameter, drag_coefficient, altitude):
         """
         Calculate terminal velocity: v_terminal = sqrt(2*m*g / (ρ*C_d*A))
         """
         rho = self.calculate_air_density(altitude)
-        area = np.pi * (diameter / 2) ** 2
+        area = self.calculate_parachute_area(diameter)
         
         if rho <= 0 or drag_coefficient <= 0 or area <= 0:
             return 0
         
-        terminal_velocity = np.sqrt(2 * mass * self.g / (rho * drag_coefficient * area))
+        terminal_velocity = math.sqrt(2 * mass * self.g / (rho * drag_coefficient * area))
         return terminal_velocity
     
     def calculate_trajectory_with_wind(self, velocity, angle, wind_speed, wind_direction):
@@ -83,11 +90,12 @@ class PhysicsCalculator:
         Calculate trajectory components with wind effects
         """
         # Velocity components
-        v_vertical = velocity * np.cos(np.radians(angle))
-        v_horizontal = velocity * np.sin(np.radians(angle))
+        angle_rad = math.radians(angle)
+        v_vertical = velocity * math.cos(angle_rad)
+        v_horizontal = velocity * math.sin(angle_rad)
         
         # Add wind effect
-        v_horizontal_total = v_horizontal + wind_speed * np.cos(np.radians(wind_direction))
+        v_horizontal_total = v_horizontal + wind_speed * math.cos(math.radians(wind_direction))
         
         return v_vertical, v_horizontal_total
     
@@ -1,204 +1,189 @@
+import math
+import warnings
 import numpy as np
 from .physics import PhysicsCalculator
+from ._kernels import (EULER, RK4, KERNEL_VERSION, KERNEL_CONSTANTS,
+                       _simulate, _simulate_batch)
+
+# Prefer the ahead-of-time compiled Cython kernel (python setup.py build_ext --inplace),
+# which has no JIT warm-up; the Numba kernel is used when it has not been built, or
+# when the build no longer matches _kernels.py
+try:
+    from . import _phys_core
+except ImportError:
+    _phys_core = None
+
+if _phys_core is not None:
+    if (getattr(_phys_core, 'KERNEL_VERSION', None) == KERNEL_VERSION
+            and getattr(_phys_core, 'KERNEL_CONSTANTS', None) == KERNEL_CONSTANTS):
+        _simulate = _phys_core.simulate
+    else:
+        warnings.warn("src._phys_core is out of date with src/_kernels.py and is ignored; "
+                      "rebuild it with 'python setup.py build_ext --inplace'", RuntimeWarning)
+
+# Integration schemes supported by the simulation kernels
+INTEGRATORS = {'Euler': EULER, 'RK4': RK4}
 
 class ParachuteSimulation:
-    def __init__(self, global_params, phase_params, selected_phases):
+    def __init__(self, global_params, phase_params, selected_phases, integrator='Euler',
+                 skip_steady_state=False):
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator '{integrator}', expected one of {list(INTEGRATORS)}")
+        
         self.global_params = global_params
         self.phase_params = phase_params
         self.selected_phases = selected_phases
+        self.integrator = integrator
+        self.skip_steady_state = skip_steady_state
         self.physics = PhysicsCalculator()
         
-        # Initialize simulation arrays
-        self.time = []
-        self.altitude = []
-        self.velocity = []
-        self.total_drag_force = []
-        self.phase_drag_forces = {phase: [] for phase in selected_phases}
-        self.horizontal_position = []
-        
-        # Current state
-        self.current_time = 0.0
-        self.current_altitude = global_params['initial_altitude']
-        self.current_velocity = global_params['initial_velocity']
-        self.current_horizontal_pos = 0.0
+        self.initial_altitude = float(global_params['initial_altitude'])
+        self.initial_velocity = float(global_params['initial_velocity'])
         self.dt = global_params['time_step']
-        self.descent_angle_rad = np.radians(global_params['descent_angle'])
-        
-        # Phase tracking
-        self.active_phases = []
-        self.deployed_phases = set()
-        self.phase_deployment_times = {}
-        self.phase_inflation_times = {}
-        
+        self.descent_angle_rad = math.radians(global_params['descent_angle'])
+        self.cos_angle = math.cos(self.descent_angle_rad)
+        self.sin_angle = math.sin(self.descent_angle_rad)
+        self.gravity_component = self.physics.g * self.cos_angle
+        
+        # Pre-allocate simulation arrays (one slot per time step up to the 10000 s cap)
+        self.max_steps = int(10000 / self.dt) + 1
+        self.step = 0
+        self.time = np.empty(self.max_steps, dtype=np.float64)
+        self.altitude = np.empty(self.max_steps, dtype=np.float64)
+        self.velocity = np.empty(self.max_steps, dtype=np.float64)
+        self.total_drag_force = np.empty(self.max_steps, dtype=np.float64)
+        self.horizontal_position = np.empty(self.max_steps, dtype=np.float64)
+        
+        # Phases are packed in deployment order (highest deployment altitude first);
+        # phase_index maps each phase to its row in the packed arrays
+        order = sorted(range(len(selected_phases)),
+                       key=lambda j: -phase_params[selected_phases[j]]['deployment_altitude'])
+        self.phase_index = {selected_phases[j]: row for row, j in enumerate(order)}
+        packed = [phase_params[selected_phases[j]] for j in order]
+        self.phase_deploy_alt = np.array([p['deployment_altitude'] for p in packed], dtype=np.float64)
+        self.phase_diam = np.array([p['diameter'] for p in packed], dtype=np.float64)
+        self.phase_area = np.pi * (self.phase_diam * 0.5) ** 2
+        self.phase_Cd = np.array([p['drag_coefficient'] for p in packed], dtype=np.float64)
+        self.phase_reef = np.array([p['reefing_factor'] for p in packed], dtype=np.float64)
+        self.phase_n = np.array([p['inflation_index'] for p in packed], dtype=np.float64)
+        self.phase_mass = np.array([p['payload_mass'] for p in packed], dtype=np.float64)
+        self.phase_order = np.array(order, dtype=np.intp)  # index in selected_phases
+        
+        # Mass before any phase deploys comes from the first selected phase
+        self.default_mass = float(phase_params[selected_phases[0]]['payload_mass'])
+        
+        # Per-phase drag forces, one row per time step and one column per packed phase
+        self.phase_drag_forces = np.zeros((self.max_steps, len(selected_phases)), dtype=np.float64)
+        
+        # Phase tracking, in packed order
+        self.deployed_mask = np.zeros(len(selected_phases), dtype=np.bool_)
+        self.deploy_times = np.full(len(selected_phases), np.inf)
+        self.inflation_times = np.zeros(len(selected_phases), dtype=np.float64)
+    
     def run(self):
         """Run the complete parachute simulation"""
-        
-        while self.current_altitude > 0:
-            # Check for phase deployments
-            self._check_phase_deployments()
-            
-            # Calculate forces for current time step
-            self._calculate_forces()
-            
-            # Update dynamics
-            self._update_dynamics()
-            
-            # Store data
-            self._store_data()
-            
-            # Advance time
-            self.current_time += self.dt
-            
-            # Safety check
-            if self.current_time > 10000:  # 10000 seconds max
-                break
+        self.step = _simulate(
+            self.initial_altitude, self.initial_velocity, float(self.dt),
+            self.gravity_component, self.sin_angle, self.default_mass,
+            INTEGRATORS[self.integrator], self.skip_steady_state,
+            self.phase_deploy_alt, self.phase_diam, self.phase_area, self.phase_Cd,
+            self.phase_reef, self.phase_n, self.phase_mass, self.phase_order,
+            self.time, self.altitude, self.velocity, self.total_drag_force,
+            self.horizontal_position, self.phase_drag_forces,
+            self.deployed_mask, self.deploy_times, self.inflation_times, self.physics._rho
+        )
         
         return self._compile_results()
     
-    def _check_phase_deployments(self):
-        """Check if any phases should be deployed at current altitude"""
-        for phase in self.selected_phases:
-            if phase not in self.deployed_phases:
-                deployment_altitude = self.phase_params[phase]['deployment_altitude']
-                
-                if self.current_altitude <= deployment_altitude:
-                    self._deploy_phase(phase)
-    
-    def _deploy_phase(self, phase):
-        """Deploy a specific parachute phase"""
-        self.deployed_phases.add(phase)
-        self.phase_deployment_times[phase] = self.current_time
-        
-        # Calculate inflation time
-        diameter = self.phase_params[phase]['diameter']
-        n_factor = self.phase_params[phase]['inflation_index']
-        
-        # Use current velocity for inflation time calculation
-        inflation_time = self.physics.calculate_inflation_time(
-            n_factor, diameter, self.current_velocity
+    def run_batch(self, initial_altitudes=None, initial_velocities=None, payload_masses=None):
+        """
+        Run an ensemble of descents for sensitivity / Monte-Carlo studies.
+        
+        Each argument is an array of shape (N,) (or a scalar) overriding the
+        configured initial altitude, initial velocity or payload mass (applied
+        to every phase); None keeps the configured value. Phase parameters,
+        time step and integrator are shared by all lanes. Returns a dict of
+        summary arrays of shape (N,).
+        """
+        if initial_altitudes is None:
+            initial_altitudes = self.initial_altitude
+        if initial_velocities is None:
+            initial_velocities = self.initial_velocity
+        if payload_masses is None:
+            payload_masses = np.nan
+        
+        lane_alt0, lane_v0, lane_mass = (
+            np.ascontiguousarray(values, dtype=np.float64)
+            for values in np.broadcast_arrays(np.atleast_1d(initial_altitudes),
+                                         np.atleast_1d(initial_velocities),
+                                         np.atleast_1d(payload_masses))
+        )
+        n_lanes = lane_alt0.shape[0]
+        
+        # Without a mass override every lane uses the configured phase masses
+        overridden = ~np.isnan(lane_mass)
+        lane_default_mass = np.where(overridden, lane_mass, self.default_mass)
+        lane_phase_mass = np.where(overridden[:, None], lane_mass[:, None], self.phase_mass[None, :])
+        
+        out_max_drag = np.zeros(n_lanes)
+        out_landing_v = np.zeros(n_lanes)
+        out_flight_t = np.zeros(n_lanes)
+        out_range = np.zeros(n_lanes)
+        
+        _simulate_batch(
+            lane_alt0, lane_v0, lane_default_mass, np.ascontiguousarray(lane_phase_mass),
+            float(self.dt), self.gravity_component, self.sin_angle,
+            INTEGRATORS[self.integrator], self.skip_steady_state, self.max_steps,
+            self.phase_deploy_alt, self.phase_diam, self.phase_area,
+            self.phase_Cd, self.phase_reef, self.phase_n, self.phase_order,
+            out_max_drag, out_landing_v, out_flight_t, out_range, self.physics._rho
         )
         
-        self.phase_inflation_times[phase] = inflation_time
-        
-        # Add to active phases
-        self.active_phases.append({
-            'phase': phase,
-            'deployment_time': self.current_time,
-            'inflation_time': inflation_time,
-            'params': self.phase_params[phase]
-        })
-    
-    def _calculate_forces(self):
-        """Calculate drag forces for all active phases"""
-        total_drag = 0.0
-        
-        # Reset phase drag forces for current time step
-        for phase in self.selected_phases:
-            self.phase_drag_forces[phase].append(0.0)
-        
-        # Calculate drag for each active phase
-        for phase_info in self.active_phases:
-            phase = phase_info['phase']
-            params = phase_info['params']
-            
-            # Calculate time since deployment
-            time_since_deployment = self.current_time - phase_info['deployment_time']
-            
-            # Calculate drag force
-            drag_force = self.physics.calculate_drag_force(
-                altitude=self.current_altitude,
-                velocity=self.current_velocity,
-                diameter=params['diameter'],
-                drag_coefficient=params['drag_coefficient'],
-                reefing_factor=params['reefing_factor'],
-                time_since_deployment=time_since_deployment,
-                inflation_time=phase_info['inflation_time']
-            )
-            
-            # Update phase-specific drag
-            self.phase_drag_forces[phase][-1] = drag_force
-            total_drag += drag_force
-        
-        self.total_drag_force.append(total_drag)
-    
-    def _update_dynamics(self):
-        """Update altitude, velocity, and horizontal position"""
-        # Get current forces
-        current_drag = self.total_drag_force[-1] if self.total_drag_force else 0.0
-        
-        # Calculate mass (assuming constant for now)
-        mass = self._get_current_mass()
-        
-        # Calculate acceleration
-        gravity_component = self.physics.g * np.cos(self.descent_angle_rad)
-        drag_deceleration = current_drag / mass
-        
-        # Net acceleration (positive downward)
-        net_acceleration = gravity_component - drag_deceleration
-        
-        # Update velocity (Euler integration)
-        self.current_velocity += net_acceleration * self.dt
-        
-        # Ensure velocity doesn't go negative
-        self.current_velocity = max(0, self.current_velocity)
-        
-        # Update altitude
-        altitude_change = self.current_velocity * self.dt
-        self.current_altitude -= altitude_change
-        
-        # Update horizontal position
-        horizontal_velocity = self.current_velocity * np.sin(self.descent_angle_rad)
-        self.current_horizontal_pos += horizontal_velocity * self.dt
-    
-    def _get_current_mass(self):
-        """Get current mass (simplified - using first deployed phase mass)"""
-        if self.active_phases:
-            return self.active_phases[0]['params']['payload_mass']
-        else:
-            # Use mass from first selected phase as default
-            first_phase = self.selected_phases[0]
-            return self.phase_params[first_phase]['payload_mass']
-    
-    def _store_data(self):
-        """Store current simulation data"""
-        self.time.append(self.current_time)
-        self.altitude.append(max(0, self.current_altitude))
-        self.velocity.append(self.current_velocity)
-        self.horizontal_position.append(self.current_horizontal_pos)
+        return {
+            'max_total_drag_force': out_max_drag,
+            'landing_velocity': out_landing_v,
+            'total_flight_time': out_flight_t,
+            'total_horizontal_range': out_range
+        }
     
     def _compile_results(self):
         """Compile simulation results"""
+        n = self.step
         results = {
-            'max_total_drag_force': max(self.total_drag_force) if self.total_drag_force else 0,
-            'landing_velocity': self.velocity[-1] if self.velocity else 0,
-            'total_flight_time': self.time[-1] if self.time else 0,
-            'total_horizontal_range': self.horizontal_position[-1] if self.horizontal_position else 0,
-            'final_altitude': self.altitude[-1] if self.altitude else 0,
+            'max_total_drag_force': self.total_drag_force[:n].max() if n else 0,
+            'landing_velocity': self.velocity[n - 1] if n else 0,
+            'total_flight_time': self.time[n - 1] if n else 0,
+            'total_horizontal_range': self.horizontal_position[n - 1] if n else 0,
+            'final_altitude': self.altitude[n - 1] if n else 0,
             'phase_results': []
         }
         
         # Phase-specific results
+        max_phase_drag = self.phase_drag_forces[:n].max(axis=0) if n else np.zeros(len(self.selected_phases))
         for phase in self.selected_phases:
-            phase_drag_forces = self.phase_drag_forces[phase]
-            max_drag = max(phase_drag_forces) if phase_drag_forces else 0
+            i = self.phase_index[phase]
+            max_drag = max_phase_drag[i]
+            deployment_time = self.deploy_times[i] if self.deployed_mask[i] else 0
             
             results['phase_results'].append({
                 'Phase': phase,
                 'Max Drag Force (N)': f"{max_drag:.1f}",
-                'Deployment Time (s)': f"{self.phase_deployment_times.get(phase, 0):.1f}",
-                'Inflation Time (s)': f"{self.phase_inflation_times.get(phase, 0):.1f}"
+                'Deployment Time (s)': f"{deployment_time:.1f}",
+                'Inflation Time (s)': f"{self.inflation_times[i]:.1f}"
             })
         
         return results
     
     def get_plot_data(self):
-        """Get data for plotting"""
+        """Get data for plotting, as float32 (half the payload sent to the browser)"""
+        n = self.step
+        phase_drag_forces = self.phase_drag_forces[:n].astype(np.float32)
         return {
-            'time': np.array(self.time),
-            'altitude': np.array(self.altitude),
-            'velocity': np.array(self.velocity),
-            'total_drag_force': np.array(self.total_drag_force),
-            'phase_drag_forces': {phase: np.array(forces) for phase, forces in self.phase_drag_forces.items()},
-            'horizontal_position': np.array(self.horizontal_position),
+            'time': self.time[:n].astype(np.float32),
+            'altitude': self.altitude[:n].astype(np.float32),
+            'velocity': self.velocity[:n].astype(np.float32),
+            'total_drag_force': self.total_drag_force[:n].astype(np.float32),
+            'phase_drag_forces': {phase: phase_drag_forces[:, i] for phase, i in self.phase_index.items()},
+            'horizontal_position': self.horizontal_position[:n].astype(np.float32),
             'selected_phases': self.selected_phases
-        }
\ No newline at end of file
+        }
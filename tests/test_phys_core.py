@@ -0,0 +1,69 @@
+"""
+Parity checks between the optional Cython kernel (src/_phys_core.pyx) and the
+Numba kernel it mirrors (src/_kernels._simulate). Skipped when the extension
+has not been built (python setup.py build_ext --inplace).
+"""
+import numpy as np
+import pytest
+
+from src import _kernels, simulation
+from src.simulation import ParachuteSimulation
+
+# Only a missing extension skips the module; a broken src package still fails
+_phys_core = pytest.importorskip("src._phys_core")
+
+def _phase(diameter, drag_coefficient, deployment_altitude, inflation_index, payload_mass):
+    return {
+        'diameter': diameter,
+        'drag_coefficient': drag_coefficient,
+        'deployment_altitude': deployment_altitude,
+        'inflation_index': inflation_index,
+        'payload_mass': payload_mass,
+        'reefing_factor': 0.3
+    }
+
+SCENARIOS = {
+    # Drogue then Main deploying on the way down
+    'sequential': (
+        {'initial_altitude': 3000.0, 'initial_velocity': 50.0, 'time_step': 0.01, 'descent_angle': 10.0},
+        {'Drogue': _phase(2.0, 1.2, 2800.0, 8.0, 100.0), 'Main': _phase(10.0, 1.5, 1000.0, 10.0, 100.0)},
+        ['Drogue', 'Main']
+    ),
+    # Both phases deploy on the first step; the mass comes from the first selected one
+    'simultaneous': (
+        {'initial_altitude': 500.0, 'initial_velocity': 50.0, 'time_step': 0.01, 'descent_angle': 10.0},
+        {'Drogue': _phase(2.0, 1.2, 2500.0, 8.0, 100.0), 'Main': _phase(10.0, 1.5, 800.0, 10.0, 300.0)},
+        ['Main', 'Drogue']
+    )
+}
+
+def test_build_is_current():
+    assert _phys_core.KERNEL_VERSION == _kernels.KERNEL_VERSION, "rebuild src._phys_core"
+    assert _phys_core.KERNEL_CONSTANTS == _kernels.KERNEL_CONSTANTS, "rebuild src._phys_core"
+    assert simulation._simulate is _phys_core.simulate
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+@pytest.mark.parametrize("integrator", ["Euler", "RK4"])
+@pytest.mark.parametrize("skip_steady_state", [False, True])
+def test_matches_numba_kernel(monkeypatch, scenario, integrator, skip_steady_state):
+    global_params, phase_params, selected_phases = SCENARIOS[scenario]
+    
+    runs = []
+    for kernel in (_kernels._simulate, _phys_core.simulate):
+        monkeypatch.setattr(simulation, "_simulate", kernel)
+        sim = ParachuteSimulation(global_params, phase_params, selected_phases,
+                                  integrator=integrator, skip_steady_state=skip_steady_state)
+        sim.run()
+        runs.append(sim)
+    numba_sim, cython_sim = runs
+    
+    assert cython_sim.step == numba_sim.step
+    n = numba_sim.step
+    for name in ('time', 'altitude', 'velocity', 'total_drag_force', 'horizontal_position',
+                 'phase_drag_forces'):
+        np.testing.assert_allclose(getattr(cython_sim, name)[:n], getattr(numba_sim, name)[:n],
+                                   rtol=1e-9, atol=1e-9, err_msg=name)
+    
+    np.testing.assert_array_equal(cython_sim.deployed_mask, numba_sim.deployed_mask)
+    np.testing.assert_allclose(cython_sim.deploy_times, numba_sim.deploy_times, rtol=1e-12)
+    np.testing.assert_allclose(cython_sim.inflation_times, numba_sim.inflation_times, rtol=1e-12)
@@ -0,0 +1,29 @@
+"""
+Checks for the air density lookup shared by PhysicsCalculator and the kernels.
+"""
+import pytest
+
+from src.physics import PhysicsCalculator, RHO_TABLE, RHO_TABLE_MAX_ALTITUDE
+
+@pytest.mark.parametrize("altitude", [RHO_TABLE_MAX_ALTITUDE, 1e6, 2.0 ** 63, 1e19, 1e300])
+def test_air_density_floor_above_table(altitude):
+    # Altitudes past the table end, including ones that overflow an int64
+    # conversion, must return the low-density floor and not read outside the table
+    assert PhysicsCalculator().calculate_air_density(altitude) == RHO_TABLE[-1] == 0.001
+
+def test_air_density_interpolates_inside_table():
+    physics = PhysicsCalculator()
+    assert physics.calculate_air_density(-5.0) == RHO_TABLE[0]
+    assert physics.calculate_air_density(1000.5) == pytest.approx(0.5 * (RHO_TABLE[1000] + RHO_TABLE[1001]))
+
+def test_calculate_drag_force_takes_diameter():
+    physics = PhysicsCalculator()
+    with pytest.deprecated_call():
+        force = physics.calculate_drag_force(altitude=1000.0, velocity=40.0, diameter=10.0,
+                                             drag_coefficient=1.5, reefing_factor=0.3,
+                                             time_since_deployment=1.0, inflation_time=4.0)
+    
+    # Original formula: full drag on the canopy area, scaled by reefing progress
+    rho = physics.calculate_air_density(1000.0)
+    area = physics.calculate_parachute_area(10.0)
+    assert force == pytest.approx(0.5 * rho * 40.0 ** 2 * 1.5 * area * (0.3 + 0.7 * 0.25))
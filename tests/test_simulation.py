@@ -0,0 +1,51 @@
+"""
+Checks for ParachuteSimulation on the Numba kernels, against results of the
+original pure-Python simulation. Runs whether or not src._phys_core is built.
+"""
+import pytest
+
+from src import _kernels, simulation
+from src.simulation import ParachuteSimulation
+
+def _phase(diameter, drag_coefficient, deployment_altitude, inflation_index, payload_mass):
+    return {
+        'diameter': diameter,
+        'drag_coefficient': drag_coefficient,
+        'deployment_altitude': deployment_altitude,
+        'inflation_index': inflation_index,
+        'payload_mass': payload_mass,
+        'reefing_factor': 0.3
+    }
+
+# Both phases deploy on the first step
+GLOBAL_PARAMS = {'initial_altitude': 500.0, 'initial_velocity': 50.0, 'time_step': 0.01, 'descent_angle': 10.0}
+PHASE_PARAMS = {'Drogue': _phase(2.0, 1.2, 2500.0, 8.0, 100.0), 'Main': _phase(10.0, 1.5, 800.0, 10.0, 300.0)}
+
+# Selection order -> (landing velocity, flight time) of the original simulation,
+# which uses the payload mass of the first selected phase
+BASELINE = {
+    ('Main', 'Drogue'): (6.239340537914319, 76.48),
+    ('Drogue', 'Main'): (3.6020003548565764, 134.59)
+}
+
+@pytest.fixture(autouse=True)
+def numba_kernel(monkeypatch):
+    monkeypatch.setattr(simulation, "_simulate", _kernels._simulate)
+
+@pytest.mark.parametrize("selected_phases", sorted(BASELINE))
+def test_simultaneous_deployment_matches_baseline(selected_phases):
+    landing_velocity, flight_time = BASELINE[selected_phases]
+    
+    results = ParachuteSimulation(GLOBAL_PARAMS, PHASE_PARAMS, list(selected_phases)).run()
+    assert results['landing_velocity'] == pytest.approx(landing_velocity, rel=1e-6)
+    assert results['total_flight_time'] == pytest.approx(flight_time, abs=1e-6)
+
+@pytest.mark.parametrize("selected_phases", sorted(BASELINE))
+def test_run_batch_matches_run(selected_phases):
+    sim = ParachuteSimulation(GLOBAL_PARAMS, PHASE_PARAMS, list(selected_phases))
+    batch = sim.run_batch()
+    results = sim.run()
+    
+    for name in ('max_total_drag_force', 'landing_velocity', 'total_flight_time',
+                 'total_horizontal_range'):
+        assert batch[name][0] == pytest.approx(results[name], rel=1e-12), name
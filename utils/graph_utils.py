@@ -2,6 +2,55 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
+def _lttb(x, y, n_out):
+    """
+    Downsample a trace to n_out points with Largest-Triangle-Three-Buckets,
+    keeping the points that best preserve the visual shape (peaks included)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    
+    # Areas are computed in float64; the selected points keep the input dtype
+    x_in = np.asarray(x)
+    y_in = np.asarray(y)
+    x = x_in.astype(np.float64)
+    y = y_in.astype(np.float64)
+    
+    # First and last points are always kept; interior points go into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    bucket_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    bucket_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    
+    # Third triangle vertex of each bucket: average of the next bucket
+    # (the last point for the final bucket)
+    next_xs = bucket_x[1:].tolist() + [x[-1]]
+    next_ys = bucket_y[1:].tolist() + [y[-1]]
+    
+    # Bind loop-invariant lookups to locals for the per-bucket loop
+    starts = edges[:-1].tolist()
+    ends = edges[1:].tolist()
+    abs_ = np.abs
+    argmax = np.argmax
+    
+    selected = [0] * n_out
+    selected[-1] = n - 1
+    
+    a = 0
+    for b in range(n_out - 2):
+        start = starts[b]
+        end = ends[b]
+        x_a = x[a]
+        y_a = y[a]
+        
+        area = abs_((x_a - next_xs[b]) * (y[start:end] - y_a)
+                    - (x_a - x[start:end]) * (next_ys[b] - y_a))
+        a = start + int(argmax(area))
+        selected[b + 1] = a
+    
+    return x_in[selected], y_in[selected]
+
 class GraphUtils:
     def __init__(self):
         self.phase_colors = {
@@ -10,6 +59,23 @@ class GraphUtils:
             'Pilot': '#eab308', 
             'Main': '#22c55e'
         }
+        
+        # Traces with more points than this are drawn with WebGL
+        self.webgl_threshold = 1000
+        
+        # Traces are downsampled to at most this many points before plotting
+        self.max_points = 5000
+    
+    def _scatter(self, x, y, **kwargs):
+        """
+        Create a line trace, downsampled with LTTB and using WebGL
+        (Scattergl) for large traces
+        """
+        x, y = _lttb(x, y, self.max_points)
+        
+        if len(x) > self.webgl_threshold:
+            return go.Scattergl(x=x, y=y, **kwargs)
+        return go.Scatter(x=x, y=y, **kwargs)
     
     def _get_time_tick_spacing(self, max_time):
         """
@@ -41,7 +107,7 @@ class GraphUtils:
         fig = go.Figure()
         
         # Add total drag force
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['time'],
             y=plots_data['total_drag_force'],
             mode='lines',
@@ -55,7 +121,7 @@ class GraphUtils:
             if phase in plots_data['phase_drag_forces']:
                 phase_forces = plots_data['phase_drag_forces'][phase]
                 if len(phase_forces) > 0 and np.max(phase_forces) > 0:
-                    fig.add_trace(go.Scatter(
+                    fig.add_trace(self._scatter(
                         x=plots_data['time'],
                         y=phase_forces,
                         mode='lines',
@@ -84,7 +150,7 @@ class GraphUtils:
         """Create Velocity vs Time plot"""
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['time'],
             y=plots_data['velocity'],
             mode='lines',
@@ -114,7 +180,7 @@ class GraphUtils:
         """Create Altitude vs Time plot"""
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['time'],
             y=plots_data['altitude'],
             mode='lines',
@@ -144,7 +210,7 @@ class GraphUtils:
         """Create 2D trajectory plot (altitude vs horizontal distance)"""
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['horizontal_position'],
             y=plots_data['altitude'],
             mode='lines+markers',
@@ -175,7 +241,7 @@ class GraphUtils:
         )
         
         # Force plot
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['time'],
             y=plots_data['total_drag_force'],
             mode='lines',
@@ -184,7 +250,7 @@ class GraphUtils:
         ), row=1, col=1)
         
         # Velocity plot
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['time'],
             y=plots_data['velocity'],
             mode='lines',
@@ -193,7 +259,7 @@ class GraphUtils:
         ), row=2, col=1)
         
         # Altitude plot
-        fig.add_trace(go.Scatter(
+        fig.add_trace(self._scatter(
             x=plots_data['time'],
             y=plots_data['altitude'],
             mode='lines',
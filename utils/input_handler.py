@@ -1,162 +1,296 @@
 import streamlit as st
+import numpy as np
+from dataclasses import dataclass
+from enum import IntEnum
+from numba import njit, prange
+from typing import NamedTuple
+
+class Phase(IntEnum):
+    """Parachute phases, valued by their position in the typical deployment sequence"""
+    ACS = 0
+    DROGUE = 1
+    PILOT = 2
+    MAIN = 3
+
+# Static phase metadata, built once at import and indexed by Phase
+PHASE_NAMES = ('ACS', 'Drogue', 'Pilot', 'Main')
+
+PHASE_COLORS = ('#ef4444', '#f97316', '#eab308', '#22c55e')
+
+@dataclass(frozen=True, slots=True)
+class PhaseInfo:
+    """Static description of a parachute phase"""
+    name: str
+    description: str
+    typical_diameter: str
+    typical_cd: str
+
+PHASE_INFO = (
+    PhaseInfo(
+        name='Attitude Control System',
+        description='Small parachute for initial stabilization',
+        typical_diameter='1-3 m',
+        typical_cd='0.8-1.2'
+    ),
+    PhaseInfo(
+        name='Drogue Parachute',
+        description='Medium parachute for deceleration',
+        typical_diameter='3-8 m',
+        typical_cd='1.0-1.4'
+    ),
+    PhaseInfo(
+        name='Pilot Parachute',
+        description='Parachute to deploy main chute',
+        typical_diameter='2-5 m',
+        typical_cd='0.9-1.3'
+    ),
+    PhaseInfo(
+        name='Main Parachute',
+        description='Primary parachute for landing',
+        typical_diameter='10-30 m',
+        typical_cd='1.2-1.8'
+    )
+)
+
+# Phase section headers, one per phase
+PHASE_HEADER_HTML = tuple(
+    f'<div class="phase-header" style="border-left-color: {color}">{name} Parachute Parameters</div>'
+    for name, color in zip(PHASE_NAMES, PHASE_COLORS)
+)
+
+# Phase names (as used by the UI and in widget keys) to Phase, for converting at entry points
+_PHASE_BY_NAME = {name: Phase(i) for i, name in enumerate(PHASE_NAMES)}
+
+# Phase parameter names and the widget key suffix each one is stored under
+_FIELDS = (
+    ('diameter', 'diameter'),
+    ('drag_coefficient', 'cd'),
+    ('deployment_altitude', 'deploy_alt'),
+    ('inflation_index', 'inflation_index'),
+    ('payload_mass', 'mass'),
+    ('reefing_factor', 'reefing')
+)
+
+# Invariant number_input arguments, one template per phase parameter
+_DIAMETER_KW = {'min_value': 0.1, 'value': None, 'step': 0.1}
+_CD_KW = {'min_value': 0.1, 'value': None, 'step': 0.1}
+_DEPLOY_ALT_KW = {'min_value': 0.0, 'value': None, 'step': 100.0}
+_INFLATION_INDEX_KW = {'min_value': 0.1, 'value': None, 'step': 0.1}
+_MASS_KW = {'min_value': 1.0, 'value': None, 'step': 10.0}
+_REEFING_KW = {'min_value': 0.0, 'max_value': 1.0, 'value': None, 'step': 0.1}
+
+# Widget labels (the same for every phase) and per-phase help strings
+_LABEL_DIAMETER = "Diameter (m)"
+_LABEL_CD = "Drag Coefficient (Cd)"
+_LABEL_DEPLOY_ALT = "Deployment Altitude (m)"
+_LABEL_INFLATION_INDEX = "Inflation Index (n)"
+_LABEL_MASS = "Payload Mass (kg)"
+_LABEL_REEFING = "Reefing Factor (0-1)"
+
+HELP_STRINGS = tuple(
+    {
+        'diameter': f"Diameter of the {phase} parachute",
+        'drag_coefficient': f"Drag coefficient for {phase} parachute",
+        'deployment_altitude': f"Altitude at which {phase} parachute deploys",
+        'inflation_index': f"Inflation index for {phase} parachute",
+        'payload_mass': f"Mass of payload for {phase} phase",
+        'reefing_factor': f"Reefing factor for {phase} parachute (0 = fully reefed, 1 = no reefing)"
+    }
+    for phase in PHASE_NAMES
+)
+
+class PhaseParams(NamedTuple):
+    """Input parameters of one parachute phase (fields in _FIELDS order)"""
+    diameter: float
+    drag_coefficient: float
+    deployment_altitude: float
+    inflation_index: float
+    payload_mass: float
+    reefing_factor: float
+
+@njit(cache=True, parallel=True)
+def _validate_numeric(phase_array):
+    """
+    Bounds-check an (N, 6) array of phase parameters (columns in _FIELDS
+    order, NaN for missing values); True if every row is valid. Compiled
+    without fastmath, which would let the NaN comparisons pass.
+    """
+    n_invalid = 0
+    for i in prange(phase_array.shape[0]):
+        row = phase_array[i]
+        if not (row[0] >= 0 and row[1] >= 0 and row[2] >= 0 and row[3] >= 0
+                and row[4] >= 0 and 0 <= row[5] <= 1):
+            n_invalid += 1
+    return n_invalid == 0
 
 class InputHandler:
-    def __init__(self):
-        self.phase_colors = {
-            'ACS': '#ef4444',
-            'Drogue': '#f97316', 
-            'Pilot': '#eab308',
-            'Main': '#22c55e'
-        }
+    # No per-instance state: every table the methods use is a module constant
+    __slots__ = ()
     
-    def get_phase_inputs(self, selected_phases):
-        """Get input parameters for selected phases"""
-        phase_params = {}
+    def get_phase_inputs(self, selected_phases, render_ui=True, values=None):
+        """
+        Get input parameters for selected phases. The widgets sit in a form, so
+        edits are applied (and the script rerun) together on submit; the values
+        returned are the last applied ones.
         
-        for phase in selected_phases:
-            st.markdown(f'<div class="phase-header" style="border-left-color: {self.phase_colors[phase]}">{phase} Parachute Parameters</div>', 
-                       unsafe_allow_html=True)
+        With render_ui=False no Streamlit UI is drawn (headless runs, tests,
+        batch validation) and the values are read from `values`, a mapping of
+        widget keys such as "Main_mass" to values, or from st.session_state.
+        """
+        if render_ui:
+            with st.form("phase_params_form"):
+                self._render_widgets(selected_phases)
+                st.form_submit_button("Apply")
+        
+        return self._collect(selected_phases, st.session_state if values is None else values)
+    
+    def _render_widgets(self, selected_phases):
+        """Render the parameter widgets for the selected phases"""
+        for name in selected_phases:
+            phase = _PHASE_BY_NAME[name]
+            st.markdown(PHASE_HEADER_HTML[phase], unsafe_allow_html=True)
             
-            col1, col2, col3 = st.columns(3)
+            # One row of columns per phase: the phase headers sit between rows, so the
+            # rows cannot share a single st.columns call
+            cols = st.columns(3)
             
-            with col1:
-                diameter = st.number_input(
-                    f"Diameter (m)",
-                    min_value=0.1,
-                    value=None,
-                    step=0.1,
-                    key=f"{phase}_diameter",
-                    help=f"Diameter of the {phase} parachute"
-                )
-                
-                drag_coefficient = st.number_input(
-                    f"Drag Coefficient (Cd)",
-                    min_value=0.1,
-                    value=None,
-                    step=0.1,
-                    key=f"{phase}_cd",
-                    help=f"Drag coefficient for {phase} parachute"
-                )
+            cols[0].number_input(
+                _LABEL_DIAMETER,
+                key=f"{name}_diameter",
+                help=HELP_STRINGS[phase]['diameter'],
+                **_DIAMETER_KW
+            )
             
-            with col2:
-                deployment_altitude = st.number_input(
-                    f"Deployment Altitude (m)",
-                    min_value=0.0,
-                    value=None,
-                    step=100.0,
-                    key=f"{phase}_deploy_alt",
-                    help=f"Altitude at which {phase} parachute deploys"
-                )
-                
-                inflation_index = st.number_input(
-                    f"Inflation Index (n)",
-                    min_value=0.1,
-                    value=None,
-                    step=0.1,
-                    key=f"{phase}_inflation_index",
-                    help=f"Inflation index for {phase} parachute"
-                )
+            cols[0].number_input(
+                _LABEL_CD,
+                key=f"{name}_cd",
+                help=HELP_STRINGS[phase]['drag_coefficient'],
+                **_CD_KW
+            )
             
-            with col3:
-                payload_mass = st.number_input(
-                    f"Payload Mass (kg)",
-                    min_value=1.0,
-                    value=None,
-                    step=10.0,
-                    key=f"{phase}_mass",
-                    help=f"Mass of payload for {phase} phase"
-                )
-                
-                reefing_factor = st.number_input(
-                    f"Reefing Factor (0-1)",
-                    min_value=0.0,
-                    max_value=1.0,
-                    value=None,
-                    step=0.1,
-                    key=f"{phase}_reefing",
-                    help=f"Reefing factor for {phase} parachute (0 = fully reefed, 1 = no reefing)"
-                )
+            cols[1].number_input(
+                _LABEL_DEPLOY_ALT,
+                key=f"{name}_deploy_alt",
+                help=HELP_STRINGS[phase]['deployment_altitude'],
+                **_DEPLOY_ALT_KW
+            )
             
-            phase_params[phase] = {
-                'diameter': diameter,
-                'drag_coefficient': drag_coefficient,
-                'deployment_altitude': deployment_altitude,
-                'inflation_index': inflation_index,
-                'payload_mass': payload_mass,
-                'reefing_factor': reefing_factor
-            }
-        
-        return phase_params
+            cols[1].number_input(
+                _LABEL_INFLATION_INDEX,
+                key=f"{name}_inflation_index",
+                help=HELP_STRINGS[phase]['inflation_index'],
+                **_INFLATION_INDEX_KW
+            )
+            
+            cols[2].number_input(
+                _LABEL_MASS,
+                key=f"{name}_mass",
+                help=HELP_STRINGS[phase]['payload_mass'],
+                **_MASS_KW
+            )
+            
+            cols[2].number_input(
+                _LABEL_REEFING,
+                key=f"{name}_reefing",
+                help=HELP_STRINGS[phase]['reefing_factor'],
+                **_REEFING_KW
+            )
+    
+    def _collect(self, selected_phases, state):
+        """Read the phase parameters from a mapping of widget keys to values"""
+        return {
+            phase: PhaseParams._make(state[f"{phase}_{suffix}"] for _, suffix in _FIELDS)
+            for phase in selected_phases
+        }
     
     def validate_inputs(self, global_params, phase_params, selected_phases):
-        """Validate that all required inputs are provided"""
+        """
+        Validate that all required inputs are provided. The result is kept in
+        st.session_state, so reruns with unchanged inputs skip the checks.
+        """
+        key = (tuple(global_params.items()),
+               tuple((phase, phase_params.get(phase)) for phase in selected_phases))
+        state = st.session_state
+        if state.get('_last_validate_key') == key:
+            valid, order_warning = state['_last_validate_result']
+        else:
+            valid, order_warning = self._check_inputs(global_params, phase_params, selected_phases)
+            state['_last_validate_key'] = key
+            state['_last_validate_result'] = (valid, order_warning)
+        
+        # The warning is part of the page, so it is shown on every rerun
+        if order_warning:
+            st.warning("⚠️ Deployment altitudes may not follow typical sequence (ACS → Drogue → Pilot → Main)")
+        
+        return valid
+    
+    def _check_inputs(self, global_params, phase_params, selected_phases):
+        """
+        Run the input checks; returns (valid, order_warning), where order_warning
+        flags deployment altitudes out of the typical sequence
+        """
         
         # Check global parameters
-        for param, value in global_params.items():
+        for value in global_params.values():
             if value is None or value <= 0:
-                return False
+                return False, False
         
-        # Check phase parameters
+        # Check phase parameters, collecting deployment altitudes in the same pass
+        deployment_altitudes = []
         for phase in selected_phases:
-            if phase not in phase_params:
-                return False
+            p = phase_params.get(phase)
+            if p is None:
+                return False, False
             
-            for param, value in phase_params[phase].items():
-                if value is None or value < 0:
-                    return False
-                
-                # Special validation for reefing factor
-                if param == 'reefing_factor' and (value < 0 or value > 1):
-                    return False
+            deployment_altitude = p.deployment_altitude
+            if (p.diameter is None or p.diameter < 0
+                    or p.drag_coefficient is None or p.drag_coefficient < 0
+                    or deployment_altitude is None or deployment_altitude < 0
+                    or p.inflation_index is None or p.inflation_index < 0
+                    or p.payload_mass is None or p.payload_mass < 0
+                    or p.reefing_factor is None or not 0 <= p.reefing_factor <= 1):
+                return False, False
+            
+            # (altitude, -selection index, Phase) sorts with the default tuple comparison;
+            # the negated index keeps equal altitudes in selection order
+            deployment_altitudes.append((deployment_altitude, -len(deployment_altitudes),
+                                         _PHASE_BY_NAME[phase]))
         
         # Check deployment altitude ordering (if multiple phases)
-        if len(selected_phases) > 1:
-            deployment_altitudes = []
-            for phase in selected_phases:
-                deployment_altitudes.append(
-                    (phase, phase_params[phase]['deployment_altitude'])
-                )
-            
+        order_warning = False
+        if len(deployment_altitudes) > 1:
             # Sort by deployment altitude (descending)
-            deployment_altitudes.sort(key=lambda x: x[1], reverse=True)
+            deployment_altitudes.sort(reverse=True)
+            sorted_phases = [phase for _, _, phase in deployment_altitudes]
             
-            # Check if altitudes are in logical order
-            phase_order = ['ACS', 'Drogue', 'Pilot', 'Main']
-            sorted_phases = [phase for phase, _ in deployment_altitudes]
-            
-            # Warn if deployment order doesn't match typical sequence
-            if sorted_phases != [p for p in phase_order if p in selected_phases]:
-                st.warning("⚠️ Deployment altitudes may not follow typical sequence (ACS → Drogue → Pilot → Main)")
+            # Flag if deployment order doesn't match typical sequence (Phase values
+            # are positions in that sequence)
+            order_warning = not all(a < b for a, b in zip(sorted_phases, sorted_phases[1:]))
         
-        return True
+        return True, order_warning
     
-    def get_phase_info(self, phase):
-        """Get information about a specific phase"""
-        phase_info = {
-            'ACS': {
-                'name': 'Attitude Control System',
-                'description': 'Small parachute for initial stabilization',
-                'typical_diameter': '1-3 m',
-                'typical_cd': '0.8-1.2'
-            },
-            'Drogue': {
-                'name': 'Drogue Parachute',
-                'description': 'Medium parachute for deceleration',
-                'typical_diameter': '3-8 m',
-                'typical_cd': '1.0-1.4'
-            },
-            'Pilot': {
-                'name': 'Pilot Parachute',
-                'description': 'Parachute to deploy main chute',
-                'typical_diameter': '2-5 m',
-                'typical_cd': '0.9-1.3'
-            },
-            'Main': {
-                'name': 'Main Parachute',
-                'description': 'Primary parachute for landing',
-                'typical_diameter': '10-30 m',
-                'typical_cd': '1.2-1.8'
-            }
-        }
+    def validate_phase_array(self, phase_array):
+        """
+        Validate many phase parameter sets at once (e.g. for a parameter sweep).
+        phase_array has shape (N, 6) with columns in PhaseParams field order and
+        NaN for missing values; the deployment-order warning is not checked.
+        """
+        phase_array = np.ascontiguousarray(phase_array, dtype=np.float64)
+        
+        # The kernel indexes the six columns without bounds checks
+        n_fields = len(PhaseParams._fields)
+        if phase_array.ndim != 2 or phase_array.shape[1] != n_fields:
+            raise ValueError(f"phase_array must have shape (N, {n_fields}), got {phase_array.shape}")
         
-        return phase_info.get(phase, {})
\ No newline at end of file
+        return bool(_validate_numeric(phase_array))
+    
+    def get_phase_info(self, phase):
+        """
+        Get information about a specific phase, given as a Phase or its name.
+        Returns a PhaseInfo, or None for an unknown phase.
+        """
+        if not isinstance(phase, Phase):
+            phase = _PHASE_BY_NAME.get(phase)
+            if phase is None:
+                return None
+        return PHASE_INFO[phase]